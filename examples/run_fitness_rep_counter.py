@@ -32,6 +32,7 @@ from sense.downstream_tasks.fitness_rep_counting import LAB2INT
 from sense.downstream_tasks.nn_utils import LogisticRegression
 from sense.downstream_tasks.nn_utils import Pipe
 from sense.downstream_tasks.postprocess import AggregatedPostProcessors
+from sense.downstream_tasks.postprocess import BatchedTwoPositionsCounter
 from sense.downstream_tasks.postprocess import PostprocessClassificationOutput
 from sense.downstream_tasks.postprocess import TwoPositionsCounter
 from sense.loading import build_backbone_network
@@ -81,20 +82,22 @@ def run_fitness_rep_counter(model_name: str,
     postprocessor = [
         AggregatedPostProcessors(
             post_processors=[
-                TwoPositionsCounter(
-                    pos0_idx=LAB2INT['counting - jumping_jacks_position=arms_down'],
-                    pos1_idx=LAB2INT['counting - jumping_jacks_position=arms_up'],
-                    threshold0=0.4,
-                    threshold1=0.4,
-                    out_key='Jumping Jacks',
-                ),
-                TwoPositionsCounter(
-                    pos0_idx=LAB2INT['counting - squat_position=high'],
-                    pos1_idx=LAB2INT['counting - squat_position=low'],
-                    threshold0=0.4,
-                    threshold1=0.4,
-                    out_key='squats',
-                ),
+                BatchedTwoPositionsCounter([
+                    TwoPositionsCounter(
+                        pos0_idx=LAB2INT['counting - jumping_jacks_position=arms_down'],
+                        pos1_idx=LAB2INT['counting - jumping_jacks_position=arms_up'],
+                        threshold0=0.4,
+                        threshold1=0.4,
+                        out_key='Jumping Jacks',
+                    ),
+                    TwoPositionsCounter(
+                        pos0_idx=LAB2INT['counting - squat_position=high'],
+                        pos1_idx=LAB2INT['counting - squat_position=low'],
+                        threshold0=0.4,
+                        threshold1=0.4,
+                        out_key='squats',
+                    ),
+                ]),
             ],
             out_key='counting',
         ),
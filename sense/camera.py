@@ -1,3 +1,4 @@
+import collections
 import cv2
 import numpy as np
 import os
@@ -13,7 +14,14 @@ def uniform_frame_sample(video, sample_rate):
     """
     Uniformly sample video frames according to the provided sample_rate.
     """
-    available_frames = video.shape[0]
+    return video[uniform_frame_sample_indices(video.shape[0], sample_rate)]
+
+
+def uniform_frame_sample_indices(available_frames, sample_rate):
+    """
+    Compute the indices of the frames that are kept when uniformly sampling a video with the given
+    number of frames according to the provided sample_rate.
+    """
     required_frames = np.round(sample_rate * available_frames).astype(np.int32)
 
     # Get evenly spaced indices. When upsampling, include both endpoints.
@@ -25,7 +33,7 @@ def uniform_frame_sample(video, sample_rate):
 
     # Round to closest integers
     new_indices = new_indices.round().astype(np.int32)
-    return video[new_indices]
+    return new_indices
 
 
 class VideoSource:
@@ -54,6 +62,7 @@ class VideoSource:
         """
         self.size = size
         self.preserve_aspect_ratio = preserve_aspect_ratio
+        self.filename = filename
 
         self._frames = None
         self._frame_idx = 0
@@ -73,6 +82,18 @@ class VideoSource:
 
     def _read_and_resample_frames(self, target_fps):
         video_fps = self._cam.get(cv2.CAP_PROP_FPS)
+        sample_rate = target_fps / video_fps
+        num_frames = int(self._cam.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        if sample_rate < 1. and num_frames > 0:
+            # When downsampling, only retrieve (i.e. convert and copy) the frames that are kept
+            frames = self._read_selected_frames(uniform_frame_sample_indices(num_frames, sample_rate), num_frames)
+            if frames is not None:
+                return frames
+
+            # The reported frame count was wrong, so read the whole video again
+            self._cam.release()
+            self._cam = cv2.VideoCapture(self.filename)
 
         video = []
         ret, frame = self._cam.read()
@@ -80,7 +101,27 @@ class VideoSource:
             video.append(frame)
             ret, frame = self._cam.read()
 
-        return uniform_frame_sample(np.array(video), target_fps / video_fps)
+        return uniform_frame_sample(np.array(video), sample_rate)
+
+    def _read_selected_frames(self, indices, num_frames):
+        """
+        Read the frames at the given indices, while skipping the retrieval of all others.
+        Returns None if the video doesn't contain exactly `num_frames` frames.
+        """
+        index_counts = collections.Counter(indices.tolist())
+
+        frames = []
+        for frame_idx in range(num_frames):
+            if not self._cam.grab():
+                return None
+            if frame_idx in index_counts:
+                _, frame = self._cam.retrieve()
+                frames.extend([frame] * index_counts[frame_idx])
+
+        if self._cam.grab():
+            return None
+
+        return np.array(frames)
 
     def _get_frame(self):
         if self._frames is not None:
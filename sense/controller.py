@@ -2,6 +2,7 @@ import multiprocessing
 import queue
 
 from collections import Callable
+from collections import deque
 from typing import List
 from typing import Optional
 from typing import Union
@@ -28,6 +29,8 @@ class Controller:
             path_in: Optional[str] = None,
             path_out: Optional[str] = None,
             use_gpu: bool = True,
+            half_precision: bool = False,
+            batch_size: int = 1,
             stop_event: Optional[multiprocessing.Event] = None):
         """
         :param neural_network:
@@ -51,10 +54,17 @@ class Controller:
             If provided, store the captured video in a file in this location
         :param use_gpu:
             If True, run the model on the GPU
+        :param half_precision:
+            If True, run the model in half precision. Only has an effect if the GPU is used.
+        :param batch_size:
+            Number of consecutive clips that are collected before running the model on all of them at once.
+            Values above 1 run fewer but larger forward passes, and predictions lag behind the video by a whole
+            batch. Since the video source is paced to the frame rate of the model, this doesn't increase the
+            overall throughput of the controller.
         :param stop_event:
             Event for signalling to stop model inference
         """
-        self.inference_engine = InferenceEngine(neural_network, use_gpu=use_gpu)
+        self.inference_engine = InferenceEngine(neural_network, use_gpu=use_gpu, half_precision=half_precision)
         video_source = VideoSource(
             camera_id=camera_id,
             size=self.inference_engine.expected_frame_size,
@@ -69,9 +79,13 @@ class Controller:
             self.postprocessors = [post_processors]
 
         self.callbacks = callbacks or []
+        self.num_frames_per_batch = self.inference_engine.step_size * batch_size
+        self.is_batched = batch_size > 1
 
         self.frame_index = None
         self.clip = None
+        self.pending_predictions = deque()
+        self.frames_since_prediction = None
 
         self.results_display = results_display
         self.path_out = path_out
@@ -81,6 +95,7 @@ class Controller:
 
     def run_inference(self):
         runtime_error = None
+        img = None
 
         self._start_inference()
 
@@ -92,22 +107,34 @@ class Controller:
                 img_tuple = self.video_stream.get_image()
                 # If not possible, stop
                 if img_tuple is None:
+                    if self.is_batched:
+                        self._flush_predictions(img)
                     break
 
                 # Unpack
                 img, numpy_img = img_tuple
 
-                self.clip = np.roll(self.clip, -1, 1)
-                self.clip[:, -1, :, :, :] = numpy_img
+                # Every batch is filled completely before it is handed off, so frames can be written in place
+                self.clip[:, self.frame_index - 1, :, :, :] = numpy_img
 
-                if self.frame_index == self.inference_engine.step_size:
-                    # A new clip is ready
+                if self.frame_index == self.num_frames_per_batch:
+                    # A new batch of clips is ready. Hand it off and continue with a fresh buffer, since
+                    # the inference engine preprocesses the clip in place.
                     self.inference_engine.put_nowait(self.clip)
+                    self.clip = np.empty_like(self.clip)
 
-                self.frame_index = self.frame_index % self.inference_engine.step_size
+                self.frame_index = self.frame_index % self.num_frames_per_batch
 
-                # Get predictions
-                prediction = self.inference_engine.get_nowait()
+                # Get predictions. Batched predictions arrive a whole batch after their clips and are
+                # released one per step, so that they are spread out at the rate of the model.
+                self._collect_predictions()
+
+                self.frames_since_prediction += 1
+                prediction = None
+                if self.pending_predictions and (not self.is_batched
+                                                 or self.frames_since_prediction >= self.inference_engine.step_size):
+                    prediction = self.pending_predictions.popleft()
+                    self.frames_since_prediction = 0
 
                 prediction_postprocessed = self.postprocess_prediction(prediction)
 
@@ -134,11 +161,45 @@ class Controller:
         if runtime_error:
             raise runtime_error
 
+    def _collect_predictions(self):
+        predictions = self.inference_engine.get_nowait()
+        if predictions is not None:
+            self.pending_predictions.extend(predictions)
+
+    def _flush_predictions(self, img: Optional[np.ndarray]):
+        """
+        Infer the complete clips of the last, partially filled batch at the end of the stream and release
+        all pending predictions. Since there are no frames left, they are displayed on the last frame.
+        """
+        if not self.inference_engine.is_alive():
+            return
+
+        # Collect the predictions for the last full batch first, so they are not replaced by the ones below
+        self.inference_engine.wait_until_idle()
+        self._collect_predictions()
+
+        num_frames = self.frame_index - 1
+        num_frames -= num_frames % self.inference_engine.step_size
+        if num_frames > 0:
+            self.inference_engine.put_nowait(self.clip[:, :num_frames])
+            self.inference_engine.wait_until_idle()
+            self._collect_predictions()
+
+        while self.pending_predictions:
+            prediction_postprocessed = self.postprocess_prediction(self.pending_predictions.popleft())
+
+            if img is not None:
+                self.display_prediction(img, prediction_postprocessed)
+
+            if not all(callback(prediction_postprocessed) for callback in self.callbacks):
+                break
+
     def postprocess_prediction(self, prediction):
-        post_processed_data = {}
+        # Collect all results in a single dictionary, which is returned as is
+        post_processed_data = {'prediction': prediction}
         for post_processor in self.postprocessors:
             post_processed_data.update(post_processor(prediction))
-        return {'prediction': prediction, **post_processed_data}
+        return post_processed_data
 
     def display_prediction(self, img: np.ndarray, prediction_postprocessed: dict):
         # Live display
@@ -154,14 +215,16 @@ class Controller:
 
     def _start_inference(self):
         print("Starting inference")
-        self.clip = np.random.randn(
+        self.clip = np.empty((
             1,
-            self.inference_engine.step_size,
+            self.num_frames_per_batch,
             self.inference_engine.expected_frame_size[0],
             self.inference_engine.expected_frame_size[1],
             3
-        )
+        ), dtype=np.float32)
         self.frame_index = 0
+        self.pending_predictions.clear()
+        self.frames_since_prediction = self.inference_engine.step_size
         self.inference_engine.start()
         self.video_stream.start()
         self.results_display.initialize()
@@ -80,8 +80,12 @@ class LogisticRegression(nn.Sequential):
 
     def forward(self, input_tensor):
         if self.global_average_pooling:
-            input_tensor = input_tensor.mean(dim=-1).mean(dim=-1)
-        return super().forward(input_tensor)
+            # Pool over both spatial dimensions in a single reduction
+            input_tensor = input_tensor.mean(dim=[-2, -1])
+        # Iterate over the layers explicitly rather than calling super(), so that the module can be scripted
+        for layer in self:
+            input_tensor = layer(input_tensor)
+        return input_tensor
 
 
 class LogisticRegressionSigmoid(LogisticRegression):
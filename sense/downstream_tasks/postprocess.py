@@ -1,3 +1,5 @@
+import functools
+
 from collections import deque
 from typing import List
 
@@ -106,6 +108,70 @@ class TwoPositionsCounter(PostProcessor):
         return {self.out_key: self.count}
 
 
+def _update_two_positions_counters(classif_output, pos0, pos1, threshold0, threshold1, current_positions, counts):
+    """
+    Update the current positions and counts of several two-positions counters in-place.
+    This is meant to be compiled with Numba, see `_compile_update_two_positions_counters`.
+    """
+    for idx in range(len(counts)):
+        if current_positions[idx]:
+            if classif_output[pos0[idx]] > threshold0[idx]:
+                current_positions[idx] = False
+                counts[idx] += 1
+        elif classif_output[pos1[idx]] > threshold1[idx]:
+            current_positions[idx] = True
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_update_two_positions_counters():
+    """
+    Compile `_update_two_positions_counters` with Numba, or return None if it is not installed.
+    Numba is optional and slow to import, so this is only done once a batched counter is created.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True)(_update_two_positions_counters)
+
+
+class BatchedTwoPositionsCounter(PostProcessor):
+    """
+    Count several actions that are defined by alternating between two positions at once. This
+    behaves like a list of TwoPositionsCounter, but updates all counters in a single compiled loop
+    if Numba is installed, or with vectorized NumPy operations otherwise.
+    """
+
+    def __init__(self, counters: List[TwoPositionsCounter], **kwargs):
+        """
+        :param counters:
+            TwoPositionsCounters whose positions, thresholds and current states are packed into
+            arrays. Their output keys are kept and their results are returned in the same order.
+        """
+        super().__init__(**kwargs)
+        self.out_keys = [counter.out_key for counter in counters]
+        self.pos0 = np.array([counter.pos0 for counter in counters], dtype=np.int64)
+        self.pos1 = np.array([counter.pos1 for counter in counters], dtype=np.int64)
+        self.threshold0 = np.array([counter.threshold0 for counter in counters])
+        self.threshold1 = np.array([counter.threshold1 for counter in counters])
+        self.counts = np.array([counter.count for counter in counters], dtype=np.int64)
+        self.current_positions = np.array([counter.current_position == 1 for counter in counters], dtype=bool)
+        self._update_counters = _compile_update_two_positions_counters()
+
+    def postprocess(self, classif_output):
+        if classif_output is not None:
+            if self._update_counters is not None:
+                self._update_counters(classif_output, self.pos0, self.pos1, self.threshold0,
+                                      self.threshold1, self.current_positions, self.counts)
+            else:
+                to_position1 = ~self.current_positions & (classif_output[self.pos1] > self.threshold1)
+                to_position0 = self.current_positions & (classif_output[self.pos0] > self.threshold0)
+                self.current_positions = (self.current_positions | to_position1) & ~to_position0
+                self.counts += to_position0
+
+        return dict(zip(self.out_keys, self.counts.tolist()))
+
+
 class EventCounter(PostProcessor):
     """
     Count how many times a certain event, tied to a specific model class, occurs.
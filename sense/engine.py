@@ -17,18 +17,24 @@ class InferenceEngine(Thread):
     either using the local machine's CPU or GPU.
     """
 
-    def __init__(self, net: RealtimeNeuralNet, use_gpu: bool = False):
+    def __init__(self, net: RealtimeNeuralNet, use_gpu: bool = False, half_precision: bool = False):
         """
         :param net:
             The neural network to be run by the inference engine.
         :param use_gpu:
             Whether to leverage CUDA or not for neural network inference.
+        :param half_precision:
+            Whether to run the neural network in half precision and channels-last memory format.
+            Only has an effect if the GPU is used.
         """
         Thread.__init__(self)
         self.net = net
         self.use_gpu = use_gpu
+        self.half_precision = use_gpu and half_precision
         if use_gpu:
             self.net.cuda()
+        if self.half_precision:
+            self.net.half().to(memory_format=torch.channels_last)
         self._queue_in = queue.Queue(1)
         self._queue_out = queue.Queue(1)
         self._shutdown = False
@@ -58,16 +64,22 @@ class InferenceEngine(Thread):
         if self._queue_in.full():
             # Remove one clip
             self._queue_in.get_nowait()
+            self._queue_in.task_done()
         self._queue_in.put_nowait(clip)
 
-    def get_nowait(self) -> Optional[np.ndarray]:
+    def get_nowait(self) -> Optional[list]:
         """
-        Return a clip from the output queue of the inference engine if available.
+        Return the predictions for the last batch of clips from the output queue of the inference
+        engine if available. The list contains one prediction per clip, in temporal order.
         """
         if self._queue_out.empty():
             return None
         return self._queue_out.get_nowait()
 
+    def wait_until_idle(self):
+        """Block until all clips in the input queue have been inferred."""
+        self._queue_in.join()
+
     def stop(self):
         """Terminate the inference engine."""
         self._shutdown = True
@@ -83,19 +95,20 @@ class InferenceEngine(Thread):
                 clip = None
 
             if clip is not None:
-                predictions = self.infer(clip)
+                try:
+                    predictions = self.infer(clip)
 
-                # Remove time dimension
-                if isinstance(predictions, list):
-                    predictions = [pred[0] for pred in predictions]
-                else:
-                    predictions = predictions[0]
+                    # Split along the time dimension, which holds one prediction per clip in the batch
+                    if isinstance(predictions, list):
+                        predictions = [list(time_step) for time_step in zip(*predictions)]
 
-                if self._queue_out.full():
-                    # Remove one frame
-                    self._queue_out.get_nowait()
-                    print("*** Unused predictions ***")
-                self._queue_out.put(predictions, block=False)
+                    if self._queue_out.full():
+                        # Remove one batch
+                        self._queue_out.get_nowait()
+                        print("*** Unused predictions ***")
+                    self._queue_out.put(list(predictions), block=False)
+                finally:
+                    self._queue_in.task_done()
 
     def infer(self, clip: np.ndarray, batch_size=None) -> Union[np.ndarray, List[np.ndarray]]:
         """
@@ -121,11 +134,15 @@ class InferenceEngine(Thread):
             Predictions from the neural network.
         """
         predictions = []
-        with torch.no_grad():
+        # Inference mode also skips the version counter bookkeeping of autograd (available since torch 1.9)
+        inference_context = torch.inference_mode if hasattr(torch, 'inference_mode') else torch.no_grad
+        with inference_context():
             clip = self.net.preprocess(clip)
 
             if self.use_gpu:
                 clip = clip.cuda()
+            if self.half_precision:
+                clip = clip.to(dtype=torch.half, memory_format=torch.channels_last)
             if batch_size is None:
                 predictions = self.net(clip)
             else:
@@ -139,8 +156,8 @@ class InferenceEngine(Thread):
                     predictions = torch.cat(predictions, dim=0)
 
         if isinstance(predictions, list):
-            predictions = [pred.cpu().numpy() for pred in predictions]
+            predictions = [pred.cpu().float().numpy() for pred in predictions]
         else:
-            predictions = predictions.cpu().numpy()
+            predictions = predictions.cpu().float().numpy()
 
         return predictions
@@ -1,7 +1,9 @@
+import inspect
 import json
 import os
 import torch
 import yaml
+import zipfile
 
 from typing import List
 from typing import Optional
@@ -75,7 +77,7 @@ class ModelConfig:
         _, files_exist = self.check_weight_files()
         return files_exist
 
-    def load_weights(self, log_fn=print):
+    def load_weights(self, log_fn=print, mmap=False):
         path_weights, files_exist = self.check_weight_files()
 
         path_weights_string = json.dumps(path_weights, indent=4, sort_keys=True)  # used in prints
@@ -85,7 +87,7 @@ class ModelConfig:
             for name, path in path_weights.items():
                 load_fn = (load_weights_except_on_travis if path in DOWNLOADABLE_CHECKPOINT_FILES
                            else load_weights_from_resources)
-                weights[name] = load_fn(path)
+                weights[name] = load_fn(path, mmap=mmap)
 
             return weights
         else:
@@ -150,10 +152,11 @@ def get_relevant_weights(
     raise Exception(msg)
 
 
-def load_backbone_model_from_config(checkpoint_path: str) -> Tuple[ModelConfig, dict]:
+def load_backbone_model_from_config(checkpoint_path: str, mmap: bool = False) -> Tuple[ModelConfig, dict]:
     """
     Load the backbone model that was used in training for the given model checkpoint as indicated in the 'config.json'
     file. If there is no config file, StridedInflatedEfficientNet-pro will be used per default.
+    The backbone weights are memory-mapped if `mmap` is True (see `load_weights`).
     """
     config_file = os.path.join(checkpoint_path, 'config.json')
     if os.path.exists(config_file):
@@ -164,7 +167,7 @@ def load_backbone_model_from_config(checkpoint_path: str) -> Tuple[ModelConfig,
         # Assume StridedInflatedEfficientNet-pro was used
         backbone_model_config = ModelConfig('StridedInflatedEfficientNet', 'pro', [])
 
-    return backbone_model_config, backbone_model_config.load_weights()['backbone']
+    return backbone_model_config, backbone_model_config.load_weights(mmap=mmap)['backbone']
 
 
 def prepend_resources_path(checkpoint_path):
@@ -174,26 +177,34 @@ def prepend_resources_path(checkpoint_path):
     return os.path.join(RESOURCES_DIR, checkpoint_path.split(f'resources{os.sep}')[-1])
 
 
-def load_weights(checkpoint_path: str):
+def load_weights(checkpoint_path: str, mmap: bool = False):
     """
     Load weights from a checkpoint file.
 
     :param checkpoint_path:
         A string representing the absolute/relative path to the checkpoint file.
+    :param mmap:
+        Whether to memory-map the tensors, so that they are read from disk on demand instead of being
+        copied into memory upfront. Only supported for checkpoints in the zip-based format (saved with
+        torch >= 1.6) and with torch >= 2.1. Otherwise, the weights are loaded as usual.
     """
+    if mmap and 'mmap' in inspect.signature(torch.load).parameters and zipfile.is_zipfile(checkpoint_path):
+        return torch.load(checkpoint_path, map_location='cpu', mmap=True, weights_only=True)
     return torch.load(checkpoint_path, map_location='cpu')
 
 
-def load_weights_from_resources(checkpoint_path: str):
+def load_weights_from_resources(checkpoint_path: str, mmap: bool = False):
     """
     Load weights from a checkpoint file located in the resources folder.
 
     :param checkpoint_path:
         A string representing the absolute/relative path to the checkpoint file.
+    :param mmap:
+        Whether to memory-map the tensors (see `load_weights`).
     """
     checkpoint_path = prepend_resources_path(checkpoint_path)
     try:
-        return load_weights(checkpoint_path)
+        return load_weights(checkpoint_path, mmap=mmap)
 
     except FileNotFoundError:
         raise FileNotFoundError('Weights file missing: {}. '
@@ -202,16 +213,18 @@ def load_weights_from_resources(checkpoint_path: str):
                                 'instructions.'.format(checkpoint_path))
 
 
-def load_weights_except_on_travis(checkpoint_path: str):
+def load_weights_except_on_travis(checkpoint_path: str, mmap: bool = False):
     """
     Load weights from a checkpoint file, unless Travis is used. Raises an error pointing
     to the SDK page in case weights are missing.
 
     :param checkpoint_path:
         A string representing the absolute/relative path to the checkpoint file.
+    :param mmap:
+        Whether to memory-map the tensors (see `load_weights`).
     """
     if not running_on_travis():
-        return load_weights_from_resources(checkpoint_path)
+        return load_weights_from_resources(checkpoint_path, mmap=mmap)
     else:
         print('Weights are not loaded on Travis.')
         return {}
@@ -228,13 +241,13 @@ def update_backbone_weights(backbone_weights: dict, checkpoint: dict):
         Dictionary of weights from a training checkpoint. Might contain some of the backbone
         weights, which will be copied over and then removed.
     """
-    finetuned_layer_names = set(backbone_weights.keys()).intersection(checkpoint.keys())
-    for key in finetuned_layer_names:
-        backbone_weights[key] = checkpoint.pop(key)
+    # Materialize the shared keys first, since they are popped from the checkpoint below
+    finetuned_layer_names = tuple(backbone_weights.keys() & checkpoint.keys())
+    backbone_weights.update({key: checkpoint.pop(key) for key in finetuned_layer_names})
 
 
 def build_backbone_network(selected_config: ModelConfig, weights: dict,
-                           weights_finetuned: dict = None):
+                           weights_finetuned: dict = None, assign: bool = False):
     """
     Creates a backbone network and load provided weights, unless Travis is used.
 
@@ -244,6 +257,9 @@ def build_backbone_network(selected_config: ModelConfig, weights: dict,
         A model state dict.
     :param  weights_finetuned:
         A state dict that contains the finetuned weights of a subset of the model layers.
+    :param assign:
+        Whether to use the given tensors as parameters instead of copying them, e.g. to keep memory-mapped
+        weights. The weights must not be shared with another network then. Ignored for torch < 2.1.
     :return:
         A backbone network, with pre-trained weights.
     """
@@ -251,7 +267,10 @@ def build_backbone_network(selected_config: ModelConfig, weights: dict,
     if not running_on_travis():
         if weights_finetuned:
             update_backbone_weights(weights, weights_finetuned)
-        backbone_network.load_state_dict(weights)
+        if assign and 'assign' in inspect.signature(backbone_network.load_state_dict).parameters:
+            backbone_network.load_state_dict(weights, assign=True)
+        else:
+            backbone_network.load_state_dict(weights)
     backbone_network.eval()
     return backbone_network
 
@@ -42,6 +42,21 @@ class TestVideoSource(unittest.TestCase):
         assert video_source._frames is not None  # Frames should be pre-computed and resampled
         assert video_source.get_image() is not None
 
+    def test_from_file_change_fps_matches_full_read(self):
+        video_source = VideoSource(filename=VIDEO_PATH, target_fps=5)
+
+        video = []
+        cap = cv2.VideoCapture(VIDEO_PATH)
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        ret, frame = cap.read()
+        while ret:
+            video.append(frame)
+            ret, frame = cap.read()
+        cap.release()
+
+        expected_frames = uniform_frame_sample(np.array(video), 5 / video_fps)
+        assert np.array_equal(video_source._frames, expected_frames)
+
     def test_from_camera(self):
         class MockVideoSource:
             def __init__(self, *args):
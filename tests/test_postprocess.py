@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from sense.downstream_tasks.postprocess import BatchedTwoPositionsCounter
+from sense.downstream_tasks.postprocess import TwoPositionsCounter
+
+
+def get_counters():
+    return [
+        TwoPositionsCounter(pos0_idx=0, pos1_idx=1, threshold0=0.4, threshold1=0.4, out_key='first'),
+        TwoPositionsCounter(pos0_idx=2, pos1_idx=3, threshold0=0.6, threshold1=0.2, out_key='second'),
+    ]
+
+
+class TestBatchedTwoPositionsCounter(unittest.TestCase):
+
+    def assert_matches_individual_counters(self):
+        counters = get_counters()
+        batched_counter = BatchedTwoPositionsCounter(get_counters())
+
+        predictions = np.random.RandomState(0).rand(200, 4)
+        for prediction in list(predictions) + [None]:
+            expected = {}
+            for counter in counters:
+                expected.update(counter.postprocess(prediction))
+            assert batched_counter.postprocess(prediction) == expected
+
+    @unittest.skipIf(numba is None, 'Numba is not installed')
+    def test_matches_individual_counters_with_numba(self):
+        self.assert_matches_individual_counters()
+
+    def test_matches_individual_counters_without_numba(self):
+        with patch('sense.downstream_tasks.postprocess._compile_update_two_positions_counters', return_value=None):
+            self.assert_matches_individual_counters()
+
+    def test_counts_full_repetition(self):
+        batched_counter = BatchedTwoPositionsCounter(get_counters())
+        batched_counter.postprocess(np.array([0., 1., 0., 0.]))
+        output = batched_counter.postprocess(np.array([1., 0., 0., 0.]))
+        assert output == {'first': 1, 'second': 0}
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from tools.sense_studio import project_utils
+from tools.sense_studio.tags import tags_bp
+
+
+def get_project_config(tags, **kwargs):
+    config = {
+        'name': 'Test Project',
+        'date_created': '2021-01-01',
+        'tags': tags,
+        'classes': {},
+        'use_gpu': False,
+        'temporal': False,
+        'assisted_tagging': False,
+        'video_recording': {
+            'countdown': 3,
+            'recording': 5,
+        },
+    }
+    config.update(kwargs)
+    return config
+
+
+class TestProjectTags(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = self.temp_dir.name
+
+        app = Flask(__name__)
+        app.register_blueprint(tags_bp)
+        app.add_url_rule('/project/<string:project>', 'project_details', lambda project: '')
+        self.client = app.test_client()
+
+        lookup_patcher = patch.object(project_utils, 'lookup_project_path', return_value=self.path)
+        lookup_patcher.start()
+        self.addCleanup(lookup_patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config_file(self, config):
+        with open(os.path.join(self.path, project_utils.PROJECT_CONFIG_FILE), 'w') as f:
+            json.dump(config, f)
+
+    def read_config_file(self):
+        with open(os.path.join(self.path, project_utils.PROJECT_CONFIG_FILE), 'r') as f:
+            return json.load(f)
+
+    def test_migrates_tags_dict_to_list(self):
+        self.write_config_file(get_project_config({'1': 'a', '3': 'c'}, max_tag_index=4))
+
+        config = project_utils.load_project_config(self.path)
+        assert config['tags'] == [None, 'a', None, 'c', None]
+        assert 'max_tag_index' not in config
+        assert self.read_config_file() == config
+
+        self.client.post('/create-tag/Test%20Project', data={'newTagName': 'e'})
+        assert self.read_config_file()['tags'] == [None, 'a', None, 'c', None, 'e']
+
+    def test_migrates_empty_tags_dict(self):
+        self.write_config_file(get_project_config({}, max_tag_index=0))
+
+        config = project_utils.load_project_config(self.path)
+        assert config['tags'] == [None]
+        assert 'max_tag_index' not in config
+
+    def test_remove_tag_keeps_indices_of_other_tags(self):
+        self.write_config_file(get_project_config([None, 'a', 'b'], classes={'class': [1, 2]}))
+
+        self.client.get('/remove-tag/Test%20Project/1')
+        config = self.read_config_file()
+        assert config['tags'] == [None, None, 'b']
+        assert config['classes'] == {'class': [2]}
+
+        self.client.post('/create-tag/Test%20Project', data={'newTagName': 'c'})
+        assert self.read_config_file()['tags'] == [None, None, 'b', 'c']
@@ -1,47 +1,50 @@
 #!/usr/bin/env python
 """
 Run a custom classifier that was obtained via the train_classifier script.
-
-Usage:
-  run_custom_classifier.py --custom_classifier=PATH
-                           [--camera_id=CAMERA_ID]
-                           [--path_in=FILENAME]
-                           [--path_out=FILENAME]
-                           [--title=TITLE]
-                           [--use_gpu]
-  run_custom_classifier.py (-h | --help)
-
-Options:
-  --custom_classifier=PATH   Path to the custom classifier to use
-  --path_in=FILENAME         Video file to stream from
-  --path_out=FILENAME        Video file to stream to
-  --title=TITLE              This adds a title to the window display
 """
+import argparse
 import os
 import json
 
-from docopt import docopt
-import torch
+from sense import RESOURCES_DIR
 
-import sense.display
-from sense.controller import Controller
-from sense.downstream_tasks.nn_utils import LogisticRegression
-from sense.downstream_tasks.nn_utils import Pipe
-from sense.downstream_tasks.postprocess import PostprocessClassificationOutput
-from sense.loading import build_backbone_network
-from sense.loading import load_backbone_model_from_config
+# Note: torch and the sense modules depending on it are imported where they are needed, so that
+# parsing the command line arguments (e.g. --help) does not have to wait for them to load.
 
 
-def run_custom_classifier(custom_classifier, camera_id=0, path_in=None, path_out=None, title=None, use_gpu=True,
-                          display_fn=None, stop_event=None):
+def compile_network(net, half_precision=False, batch_size=1, num_warmup_passes=2):
+    """
+    Compile the given network with TorchInductor and run a few warm-up passes on the GPU, so that
+    the compilation cost is paid before the inference starts. Compiled kernels are cached in the
+    resources folder to speed up subsequent runs.
+
+    Note: CUDA graphs (mode="reduce-overhead") are not used, because the backbone keeps an internal
+    state of previous frames which is replaced on every call.
+    """
+    import numpy as np
+    import torch
+
+    from sense.engine import InferenceEngine
 
-    # Load backbone network according to config file
-    backbone_model_config, backbone_weights = load_backbone_model_from_config(custom_classifier)
+    os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', os.path.join(RESOURCES_DIR, 'torch_compile_cache'))
+    net = torch.compile(net, fullgraph=False, dynamic=False)
 
-    try:
-        # Load custom classifier
-        checkpoint_classifier = torch.load(os.path.join(custom_classifier, 'best_classifier.checkpoint'))
-    except FileNotFoundError:
+    # The first pass initializes the internal state of the backbone, all following ones reuse it
+    inference_engine = InferenceEngine(net, use_gpu=True, half_precision=half_precision)
+    dummy_clip = np.zeros((1, net.step_size * batch_size, *net.expected_frame_size, 3), dtype=np.float32)
+    for _ in range(num_warmup_passes):
+        inference_engine.infer(dummy_clip.copy())
+
+    # Reset the internal state that was filled during warm-up
+    net.eval()
+    return net
+
+
+def run_custom_classifier(custom_classifier, camera_id=0, path_in=None, path_out=None, title=None, use_gpu=True,
+                          display_fn=None, stop_event=None):
+    # Check for the custom classifier before loading any model, so that a wrong path fails fast
+    checkpoint_path = os.path.join(custom_classifier, 'best_classifier.checkpoint')
+    if not os.path.isfile(checkpoint_path):
         msg = ("Error: No such file or directory: 'best_classifier.checkpoint'\n"
                "Hint: Provide path to 'custom_classifier'.\n")
         if display_fn:
@@ -50,22 +53,59 @@ def run_custom_classifier(custom_classifier, camera_id=0, path_in=None, path_out
             print(msg)
         return None
 
+    import torch
+
+    import sense.display
+    from sense.controller import Controller
+    from sense.downstream_tasks.nn_utils import LogisticRegression
+    from sense.downstream_tasks.nn_utils import Pipe
+    from sense.downstream_tasks.postprocess import PostprocessClassificationOutput
+    from sense.loading import build_backbone_network
+    from sense.loading import load_backbone_model_from_config
+    from sense.loading import load_weights
+
+    # Load custom classifier
+    checkpoint_classifier = load_weights(checkpoint_path, mmap=True)
+
+    # Load backbone network according to config file, reading the weights from disk on demand
+    backbone_model_config, backbone_weights = load_backbone_model_from_config(custom_classifier, mmap=True)
+
     # Create backbone network
     backbone_network = build_backbone_network(backbone_model_config, backbone_weights,
-                                              weights_finetuned=checkpoint_classifier)
+                                              weights_finetuned=checkpoint_classifier, assign=True)
 
     with open(os.path.join(custom_classifier, 'label2int.json')) as file:
         class2int = json.load(file)
-    INT2LAB = {value: key for key, value in class2int.items()}
+    # Class indices are contiguous, so a list can be indexed directly on every frame
+    INT2LAB = [None] * (max(class2int.values()) + 1)
+    for class_name, class_index in class2int.items():
+        INT2LAB[class_index] = class_name
 
     gesture_classifier = LogisticRegression(num_in=backbone_network.feature_dim,
                                             num_out=len(INT2LAB))
     gesture_classifier.load_state_dict(checkpoint_classifier)
     gesture_classifier.eval()
 
+    use_compile = use_gpu and hasattr(torch, 'compile')
+    if not use_compile:
+        # The backbone can't be traced, because it stores previous frames in an internal state between
+        # calls, but the stateless classifier head can be compiled to TorchScript
+        gesture_classifier = torch.jit.script(gesture_classifier)
+
+        if not use_gpu and hasattr(torch.jit, 'freeze'):
+            # Inline the weights as constants. This is only done on the CPU, since frozen constants
+            # can't be moved to the GPU or converted to half precision by the inference engine.
+            gesture_classifier = torch.jit.freeze(gesture_classifier)
+            if hasattr(torch.jit, 'optimize_for_inference'):
+                gesture_classifier = torch.jit.optimize_for_inference(gesture_classifier)
+
     # Concatenate feature extractor and met converter
     net = Pipe(backbone_network, gesture_classifier)
 
+    if use_compile:
+        # Fuse the network into optimized kernels to reduce the per-frame dispatch overhead
+        net = compile_network(net, half_precision=True)
+
     postprocessor = [
         PostprocessClassificationOutput(INT2LAB, smoothing=4)
     ]
@@ -87,6 +127,7 @@ def run_custom_classifier(custom_classifier, camera_id=0, path_in=None, path_out
         path_in=path_in,
         path_out=path_out,
         use_gpu=use_gpu,
+        half_precision=use_gpu,
         stop_event=stop_event,
     )
     controller.run_inference()
@@ -94,19 +135,22 @@ def run_custom_classifier(custom_classifier, camera_id=0, path_in=None, path_out
 
 if __name__ == "__main__":
     # Parse arguments
-    args = docopt(__doc__)
-    _custom_classifier = args['--custom_classifier']
-    _camera_id = int(args['--camera_id'] or 0)
-    _path_in = args['--path_in'] or None
-    _path_out = args['--path_out'] or None
-    _title = args['--title'] or None
-    _use_gpu = args['--use_gpu']
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--custom_classifier', metavar='PATH', required=True,
+                        help='Path to the custom classifier to use')
+    parser.add_argument('--camera_id', metavar='CAMERA_ID', type=int, default=0,
+                        help='Index of the webcam to stream from')
+    parser.add_argument('--path_in', metavar='FILENAME', help='Video file to stream from')
+    parser.add_argument('--path_out', metavar='FILENAME', help='Video file to stream to')
+    parser.add_argument('--title', metavar='TITLE', help='This adds a title to the window display')
+    parser.add_argument('--use_gpu', action='store_true', help='Whether to run inference on the GPU or not')
+    args = parser.parse_args()
 
     run_custom_classifier(
-        custom_classifier=_custom_classifier,
-        camera_id=_camera_id,
-        path_in=_path_in,
-        path_out=_path_out,
-        title=_title,
-        use_gpu=_use_gpu,
+        custom_classifier=args.custom_classifier,
+        camera_id=args.camera_id,
+        path_in=args.path_in or None,
+        path_out=args.path_out or None,
+        title=args.title or None,
+        use_gpu=args.use_gpu,
     )
@@ -1,7 +1,10 @@
 import datetime
 import json
 import os
+import shutil
+import threading
 
+import orjson
 from natsort import natsorted
 from natsort import ns
 
@@ -13,6 +16,8 @@ PROJECTS_OVERVIEW_CONFIG_FILE = os.path.join(MODULE_DIR, 'projects_config.json')
 
 PROJECT_CONFIG_FILE = 'project_config.json'
 
+_project_config_locks = {}
+
 
 def load_project_overview_config():
     if os.path.isfile(PROJECTS_OVERVIEW_CONFIG_FILE):
@@ -64,12 +69,11 @@ def _backwards_compatibility_update(path, config):
             tags_list.extend(class_tags)
 
         # Assign project-wide unique indices to tags (0 is reserved for 'background')
-        tags = {idx + 1: tag_name for idx, tag_name in enumerate(sorted(tags_list))}
+        tags = [None] + sorted(tags_list)
         config['tags'] = tags
-        config['max_tag_index'] = len(tags_list)
 
         # Setup class dictionary with tag indices
-        inverse_tags = {tag_name: tag_idx for tag_idx, tag_name in tags.items()}
+        inverse_tags = {tag_name: tag_idx for tag_idx, tag_name in enumerate(tags) if tag_name is not None}
         inverse_tags['background'] = 0
         config['classes'] = {
             class_name: [inverse_tags[tag_name] for tag_name in class_tags]
@@ -96,9 +100,16 @@ def _backwards_compatibility_update(path, config):
                             json.dump(annotation_data, f, indent=2)
 
         updated = True
-    else:
-        # Translate string keys to integers (because JSON does not store integer keys)
-        config['tags'] = {int(idx_str): tag_name for idx_str, tag_name in config['tags'].items()}
+    elif isinstance(config['tags'], dict):
+        # Convert the tags dictionary (with string keys, because JSON does not store integer keys) to a
+        # list indexed by tag index, with None for removed tags
+        tags_dict = {int(idx_str): tag_name for idx_str, tag_name in config['tags'].items()}
+        num_tags = max(config.pop('max_tag_index', 0), *tags_dict.keys(), 0) + 1
+        tags = [None] * num_tags
+        for tag_idx, tag_name in tags_dict.items():
+            tags[tag_idx] = tag_name
+        config['tags'] = tags
+        updated = True
 
     if updated:
         # Save updated config
@@ -109,20 +120,45 @@ def _backwards_compatibility_update(path, config):
 
 def load_project_config(path):
     config_path = os.path.join(path, PROJECT_CONFIG_FILE)
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
 
-        config = _backwards_compatibility_update(path, config)
-    except FileNotFoundError:
-        config = None
+    # Reading may write back a migrated config, so hold the lock to not interleave with other writers
+    with project_config_lock(path):
+        try:
+            with open(config_path, 'rb') as f:
+                config = orjson.loads(f.read())
+
+            config = _backwards_compatibility_update(path, config)
+        except FileNotFoundError:
+            config = None
     return config
 
 
 def write_project_config(path, config):
     config_path = os.path.join(path, PROJECT_CONFIG_FILE)
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+
+    # Write to a temporary file first and swap it in, so that readers never see a partially written config.
+    # The temporary file is created with the default permissions and takes over those of an existing config.
+    tmp_path = f'{config_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'xb') as f:
+            f.write(data)
+        if os.path.exists(config_path):
+            shutil.copymode(config_path, tmp_path)
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def project_config_lock(path):
+    """
+    Get the lock for the config of the given project. Hold it while loading, modifying and writing
+    the config, so that requests served on concurrent threads don't overwrite each other's changes.
+    The lock is re-entrant, so helpers that update the config can be called while holding it.
+    """
+    return _project_config_locks.setdefault(os.path.abspath(path), threading.RLock())
 
 
 def setup_new_project(project_name, path, config=None):
@@ -137,8 +173,7 @@ def setup_new_project(project_name, path, config=None):
         config = {
             'name': project_name,
             'date_created': datetime.date.today().isoformat(),
-            'tags': {},
-            'max_tag_index': 0,
+            'tags': [None],  # Index 0 is reserved for 'background'
             'classes': {},
             'use_gpu': False,
             'temporal': False,
@@ -151,7 +186,8 @@ def setup_new_project(project_name, path, config=None):
     else:
         config['name'] = project_name
 
-    write_project_config(path, config)
+    with project_config_lock(path):
+        write_project_config(path, config)
 
     # Setup directory structure
     for split in SPLITS:
@@ -198,12 +234,13 @@ def get_project_setting(path, setting):
 
 
 def toggle_project_setting(path, setting):
-    config = load_project_config(path)
-    current_status = config[setting]
+    with project_config_lock(path):
+        config = load_project_config(path)
+        current_status = config[setting]
 
-    new_status = not current_status
-    config[setting] = new_status
-    write_project_config(path, config)
+        new_status = not current_status
+        config[setting] = new_status
+        write_project_config(path, config)
 
     return new_status
 
@@ -219,14 +256,15 @@ def get_timer_default(path):
 
 def set_timer_default(path, countdown, recording):
     """Set the new default countdown and recording duration (in seconds) for video-recording."""
-    config = load_project_config(path)
-    video_recording = config['video_recording']
+    with project_config_lock(path):
+        config = load_project_config(path)
+        video_recording = config['video_recording']
 
-    video_recording['countdown'] = countdown
-    video_recording['recording'] = recording
-    config['video_recording'] = video_recording
+        video_recording['countdown'] = countdown
+        video_recording['recording'] = recording
+        config['video_recording'] = video_recording
 
-    write_project_config(path, config)
+        write_project_config(path, config)
 
 
 def get_demos():
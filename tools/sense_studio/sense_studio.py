@@ -161,11 +161,12 @@ def update_project():
     project_name = data['projectName']
     path = data['path']
 
-    # Check for existing config file (might be None)
-    config = project_utils.load_project_config(path)
+    with project_utils.project_config_lock(path):
+        # Check for existing config file (might be None)
+        config = project_utils.load_project_config(path)
 
-    # Make sure the directory is correctly set up
-    project_utils.setup_new_project(project_name, path, config)
+        # Make sure the directory is correctly set up
+        project_utils.setup_new_project(project_name, path, config)
 
     return redirect(url_for('project_details', project=project_name))
 
@@ -180,16 +181,17 @@ def import_project():
     data = request.form
     path = data['path']
 
-    # Check for existing config file and make sure project name is unique
-    config = project_utils.load_project_config(path)
-    if config:
-        project_name = project_utils.get_unique_project_name(config['name'])
-    else:
-        # Use folder name as project name and make sure it is unique
-        project_name = project_utils.get_unique_project_name(os.path.basename(path))
+    with project_utils.project_config_lock(path):
+        # Check for existing config file and make sure project name is unique
+        config = project_utils.load_project_config(path)
+        if config:
+            project_name = project_utils.get_unique_project_name(config['name'])
+        else:
+            # Use folder name as project name and make sure it is unique
+            project_name = project_utils.get_unique_project_name(os.path.basename(path))
 
-    # Make sure the directory is correctly set up
-    project_utils.setup_new_project(project_name, path, config)
+        # Make sure the directory is correctly set up
+        project_utils.setup_new_project(project_name, path, config)
 
     return redirect(url_for('project_details', project=project_name))
 
@@ -214,7 +216,8 @@ def project_details(project):
                 'tagged': len(os.listdir(tags_dir)) if os.path.exists(tags_dir) else 0,
                 'videos': natsorted([video for video in os.listdir(videos_dir) if video.endswith(VIDEO_EXT)], alg=ns.IC)
             }
-    tags = config['tags']
+    # Only pass existing tags (skipping removed tags and the reserved 'background' index)
+    tags = {tag_idx: tag_name for tag_idx, tag_name in enumerate(config['tags']) if tag_name is not None}
     return render_template('project_details.html', config=config, path=path, stats=stats, project=config['name'],
                            tags=tags)
 
@@ -230,9 +233,10 @@ def add_class(project):
     class_name = data['className']
 
     # Update project config
-    config = project_utils.load_project_config(path)
-    config['classes'][class_name] = []
-    project_utils.write_project_config(path, config)
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        config['classes'][class_name] = []
+        project_utils.write_project_config(path, config)
 
     # Setup directory structure
     for split in SPLITS:
@@ -273,12 +277,13 @@ def edit_class(project, class_name):
     new_class_name = data['className']
 
     # Update project config
-    config = project_utils.load_project_config(path)
-    tags = config['classes'][class_name]
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        tags = config['classes'][class_name]
 
-    del config['classes'][class_name]
-    config['classes'][new_class_name] = tags
-    project_utils.write_project_config(path, config)
+        del config['classes'][class_name]
+        config['classes'][new_class_name] = tags
+        project_utils.write_project_config(path, config)
 
     # Update directory names
     data_dirs = []
@@ -317,9 +322,10 @@ def remove_class(project, class_name):
     path = project_utils.lookup_project_path(project)
 
     # Update project config
-    config = project_utils.load_project_config(path)
-    del config['classes'][class_name]
-    project_utils.write_project_config(path, config)
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        del config['classes'][class_name]
+        project_utils.write_project_config(path, config)
 
     return redirect(url_for("project_details", project=project))
 
@@ -334,12 +340,13 @@ def assign_tag_to_class():
     tag_index = data['tagIndex']
     class_name = data['className']
 
-    config = project_utils.load_project_config(path)
-    class_tags = config['classes'][class_name]
-    class_tags.append(int(tag_index))
-    class_tags.sort()
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        class_tags = config['classes'][class_name]
+        class_tags.append(int(tag_index))
+        class_tags.sort()
 
-    project_utils.write_project_config(path, config)
+        project_utils.write_project_config(path, config)
     return jsonify(success=True)
 
 
@@ -353,10 +360,11 @@ def remove_tag_from_class():
     tag_index = data['tagIndex']
     class_name = data['className']
 
-    config = project_utils.load_project_config(path)
-    config['classes'][class_name].remove(int(tag_index))
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        config['classes'][class_name].remove(int(tag_index))
 
-    project_utils.write_project_config(path, config)
+        project_utils.write_project_config(path, config)
     return jsonify(success=True)
 
 
@@ -408,15 +416,16 @@ def flip_videos():
     data = request.json
     project = data['projectName']
     path = project_utils.lookup_project_path(project)
-    config = project_utils.load_project_config(path)
     counterpart_class_name = str(data['counterpartClassName'])
     original_class_name = str(data['originalClassName'])
     copy_video_tags = data['videosToCopyTags']
 
-    if counterpart_class_name not in config['classes']:
-        config['classes'][counterpart_class_name] = config['classes'][original_class_name] \
-            if copy_video_tags['train'] or copy_video_tags['valid'] else []
-        project_utils.write_project_config(path, config)
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        if counterpart_class_name not in config['classes']:
+            config['classes'][counterpart_class_name] = config['classes'][original_class_name] \
+                if copy_video_tags['train'] or copy_video_tags['valid'] else []
+            project_utils.write_project_config(path, config)
 
     for split in SPLITS:
         videos_path_in = os.path.join(path, f'videos_{split}', original_class_name)
@@ -15,15 +15,16 @@ def create_tag(project):
     data = request.form
     project = urllib.parse.unquote(project)
     path = project_utils.lookup_project_path(project)
-    config = project_utils.load_project_config(path)
     tag_name = data['newTagName']
 
-    tags = config['tags']
-    new_tag_index = config['max_tag_index'] + 1
-    tags[new_tag_index] = tag_name
-    config['max_tag_index'] = new_tag_index
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+
+        # Tag indices are positions in the list, so new tags are appended
+        config['tags'].append(tag_name)
+
+        project_utils.write_project_config(path, config)
 
-    project_utils.write_project_config(path, config)
     return redirect(url_for('project_details', project=project))
 
 
@@ -31,18 +32,21 @@ def create_tag(project):
 def remove_tag(project, tag_idx):
     project = urllib.parse.unquote(project)
     path = project_utils.lookup_project_path(project)
-    config = project_utils.load_project_config(path)
-    tags = config['tags']
 
-    # Remove tag from the overall tags list
-    del tags[tag_idx]
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        tags = config['tags']
+
+        # Remove tag from the overall tags list, keeping its index reserved
+        tags[tag_idx] = None
 
-    # Remove tag from the classes
-    for class_label, class_tags in config['classes'].items():
-        if tag_idx in class_tags:
-            class_tags.remove(tag_idx)
+        # Remove tag from the classes, filtering each tag list in a single pass
+        classes = config['classes']
+        for class_label, class_tags in classes.items():
+            classes[class_label] = [class_tag for class_tag in class_tags if class_tag != tag_idx]
+
+        project_utils.write_project_config(path, config)
 
-    project_utils.write_project_config(path, config)
     return redirect(url_for('project_details', project=project))
 
 
@@ -51,12 +55,15 @@ def edit_tag(project, tag_idx):
     data = request.form
     project = urllib.parse.unquote(project)
     path = project_utils.lookup_project_path(project)
-    config = project_utils.load_project_config(path)
-    tags = config['tags']
     new_tag_name = data['newTagName']
 
-    # Update tag name
-    tags[tag_idx] = new_tag_name
+    with project_utils.project_config_lock(path):
+        config = project_utils.load_project_config(path)
+        tags = config['tags']
+
+        # Update tag name
+        tags[tag_idx] = new_tag_name
+
+        project_utils.write_project_config(path, config)
 
-    project_utils.write_project_config(path, config)
     return redirect(url_for('project_details', project=project))
@@ -133,7 +133,7 @@ def train_model(path_in, path_out, model_name, model_version, num_layers_to_fine
     label_names_temporal = ['background']
     if project_config:
         tags = project_config['tags']
-        label_names_temporal.extend(tags.values())
+        label_names_temporal.extend(tag_name for tag_name in tags if tag_name is not None)
     else:
         for label in label_names:
             label_names_temporal.extend([f'{label}_tag1', f'{label}_tag2'])